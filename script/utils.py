@@ -1,9 +1,11 @@
 import streamlit as st
+import streamlit.components.v1 as components
 import pandas as pd
 import numpy as np
 import plotly.graph_objects as go
 import os
 import sys
+import time
 from dotenv import load_dotenv
 import io
 
@@ -1262,6 +1264,43 @@ def inject_css():
             background-color: rgba(103, 162, 225, 0.2) !important;
         }
         
+        .st-key-toggle_legit_mercenary_percentage button[data-testid*="stBaseButton"],
+        .st-key-toggle_core_percentage button[data-testid*="stBaseButton"] {
+            width: auto !important;
+            min-width: 80px !important;
+            max-width: 120px !important;
+            height: 36px !important;
+            padding: 0.5rem 1rem !important;
+            font-weight: 600 !important;
+            background: linear-gradient(135deg, rgba(103, 162, 225, 0.18) 0%, rgba(103, 162, 225, 0.08) 100%) !important;
+            border: 1.5px solid rgba(103, 162, 225, 0.45) !important;
+            color: #8BB5F0 !important;
+            border-radius: 12px !important;
+            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+            box-shadow: 0 3px 12px rgba(103, 162, 225, 0.15) !important;
+            position: relative !important;
+            overflow: hidden !important;
+            letter-spacing: 0.02em !important;
+        }
+        
+        .st-key-toggle_bribes_percentage button[data-testid*="stBaseButton"] {
+            width: auto !important;
+            min-width: 100px !important;
+            max-width: 140px !important;
+            height: 36px !important;
+            padding: 0.5rem 1rem !important;
+            font-weight: 600 !important;
+            background: linear-gradient(135deg, rgba(103, 162, 225, 0.18) 0%, rgba(103, 162, 225, 0.08) 100%) !important;
+            border: 1.5px solid rgba(103, 162, 225, 0.45) !important;
+            color: #8BB5F0 !important;
+            border-radius: 12px !important;
+            transition: all 0.3s cubic-bezier(0.4, 0, 0.2, 1) !important;
+            box-shadow: 0 3px 12px rgba(103, 162, 225, 0.15) !important;
+            position: relative !important;
+            overflow: hidden !important;
+            letter-spacing: 0.02em !important;
+        }
+        
         #MainMenu {visibility: hidden;}
         footer {visibility: hidden;}
         header {visibility: hidden;}
@@ -1407,6 +1446,115 @@ def inject_css():
     </script>
     """, unsafe_allow_html=True)
 
+
+BUTTON_IDS_HTML = """
+<script>
+(function() {
+    let host = window;
+    try {
+        if (window.parent && window.parent.document) host = window.parent;
+    } catch(e) {}
+    if (host.__btnIdsObserver) {
+        host.__btnIdsObserver.disconnect();
+    }
+
+    console.log('[Button IDs] Script carregado via components.html (__PAGE__)!');
+
+    const BUTTON_SELECTOR = 'button[data-testid*="stBaseButton"]';
+
+    const BUTTON_IDS = new Map([
+        ['v2', ['btn_v2_', 'btn_v2_version_filter']],
+        ['v3', ['btn_v3_', 'btn_v3_version_filter']],
+        ['all versions', ['btn_all_versions_', 'btn_all_versions_version_filter']],
+        ['gauge', ['btn_gauge_', 'btn_gauge_filter']],
+        ['no gauge', ['btn_no_gauge_', 'btn_no_gauge_filter']],
+        ['top 20', ['btn_top20', 'btn_top20']],
+        ['worst 20', ['btn_worst20', 'btn_worst20']],
+        ['select all', ['btn_select_all', 'btn_select_all']]
+    ]);
+
+    function buttonText(button) {
+        let text = '';
+        try {
+            text = (button.textContent || button.innerText || '').trim();
+            if (!text) {
+                const el = button.querySelector('[data-testid="stMarkdownContainer"]') || button.querySelector('p');
+                if (el) {
+                    text = (el.textContent || el.innerText || '').trim();
+                }
+            }
+        } catch(e) {}
+        return text;
+    }
+
+    function applyButtonId(button) {
+        const textLower = buttonText(button).toLowerCase();
+        const entry = BUTTON_IDS.get(textLower);
+        if (entry) {
+            const [prefix, id] = entry;
+            if (!button.id || !button.id.startsWith(prefix)) {
+                button.id = id;
+            }
+        } else if (textLower.includes('logout') || textLower.includes('🚪')) {
+            if (!button.id || !button.id.startsWith('btn_logout')) {
+                button.id = 'btn_logout';
+            }
+        } else if (textLower === '%' || textLower === 'absolute') {
+            if (button.id !== 'btn_toggle_percentage') {
+                button.id = 'btn_toggle_percentage';
+                button.classList.add('performance-button-fallback');
+                button.setAttribute('data-button-type', 'toggle');
+            }
+        }
+    }
+
+    const doc = host.document;
+    if (!doc || !doc.body) return;
+    const root = doc.querySelector('[data-testid="stAppViewContainer"]') || doc.body;
+
+    function applyToSubtree(node) {
+        if (!node.isConnected) return;
+        if (node.nodeType !== 1) {
+            const owner = node.parentElement && node.parentElement.closest(BUTTON_SELECTOR);
+            if (owner) applyButtonId(owner);
+            return;
+        }
+        const owner = node.closest(BUTTON_SELECTOR);
+        if (owner) applyButtonId(owner);
+        node.querySelectorAll(BUTTON_SELECTOR).forEach(applyButtonId);
+    }
+
+    root.querySelectorAll(BUTTON_SELECTOR).forEach(applyButtonId);
+
+    const pending = new Set();
+    let pendingTimer = null;
+
+    function flushPending() {
+        pendingTimer = null;
+        pending.forEach(applyToSubtree);
+        pending.clear();
+    }
+
+    const observer = new MutationObserver((mutations) => {
+        for (const mutation of mutations) {
+            mutation.addedNodes.forEach((node) => pending.add(node));
+        }
+        if (!pending.size) return;
+        clearTimeout(pendingTimer);
+        pendingTimer = setTimeout(flushPending, 50);
+    });
+    observer.observe(root, { childList: true, subtree: true });
+    host.__btnIdsObserver = observer;
+})();
+</script>
+"""
+
+
+def inject_button_ids(page_name):
+    """Tag filter/logout/toggle buttons with stable ids; one observer per app window, replaced on iframe remount."""
+    components.html(BUTTON_IDS_HTML.replace('__PAGE__', page_name), height=0)
+
+
 def check_authentication():
     """Check if user is authenticated, show login page if not"""
     CORRECT_USERNAME = os.getenv("LOGIN_USERNAME")
@@ -1681,12 +1829,13 @@ def apply_gauge_filter(df, session_key='gauge_filter'):
     if gauge_filter == 'all':
         return df
 
+    gauge_str = df['gauge_address'].astype(str)
     has_gauge = (
         df['gauge_address'].notna()
-        & (df['gauge_address'].astype(str).str.strip() != '')
-        & (df['gauge_address'].astype(str).str.lower() != 'nan')
+        & (gauge_str.str.strip() != '')
+        & (gauge_str.str.lower() != 'nan')
     )
-    if has_gauge.sum() == 0:
+    if not has_gauge.any():
         return df
 
     if gauge_filter == 'gauge':
@@ -1821,6 +1970,10 @@ def apply_date_filter(df, year, quarter_months):
 
 MAIN_DATA_FILENAME = 'Balancer-All-Tokenomics.csv'
 BAL_EMISSIONS_FILENAME = 'BAL_Emissions_by_GaugePool.csv'
+MAIN_DATA_UNUSED_COLUMNS = frozenset({
+    'swap_amount_usd', 'tvl_usd', 'tvl_eth',
+    'swap_fee_usd', 'yield_fee_usd', 'swap_fee_percent',
+})
 
 NEON_TABLE_MAIN = os.getenv("NEON_TABLE", "tokenomics").strip() or "tokenomics"
 
@@ -1996,6 +2149,13 @@ def load_bal_emissions_daily(_merge_by_gauge=True):
     return out
 
 
+def _add_month_column(df):
+    """Add 'month' (block_date truncated to month start, tz-naive) once at load time so pages don't recompute it per rerun."""
+    if 'block_date' in df.columns:
+        df['month'] = df['block_date'].values.astype('datetime64[M]').astype('datetime64[ns]')
+    return df
+
+
 def _process_main_data(df):
     """
     Process Balancer-All-Tokenomics.csv for Streamlit: align types, merge direct_incentives from BAL_Emissions,
@@ -2011,11 +2171,7 @@ def _process_main_data(df):
         original_non_null = df['block_date'].notna().sum()
         original_dtype = df['block_date'].dtype
         
-        df['block_date'] = pd.to_datetime(df['block_date'], format='mixed', utc=True, errors='coerce')
-        
-        mask_valid = df['block_date'].notna()
-        if mask_valid.any():
-            df.loc[mask_valid, 'block_date'] = pd.to_datetime(df.loc[mask_valid, 'block_date']).dt.normalize()
+        df['block_date'] = pd.to_datetime(df['block_date'], format='mixed', utc=True, errors='coerce').dt.normalize()
         
         final_non_null = df['block_date'].notna().sum()
     numeric_cols = [
@@ -2070,7 +2226,7 @@ def _process_main_data(df):
     else:
         df['has_gauge'] = False
     
-    return classify_pools(df)
+    return classify_pools(_add_month_column(df))
 
 
 def _process_merged_data(df):
@@ -2116,7 +2272,7 @@ def _process_merged_data(df):
     else:
         df['has_gauge'] = False
     
-    df = classify_pools(df)
+    df = classify_pools(_add_month_column(df))
     return df
 
 
@@ -2160,8 +2316,38 @@ def _set_data_load_debug(use_neon_views: bool, database_url_set: bool, source: s
         pass
 
 
-@st.cache_data
+def _local_main_data_mtime():
+    """mtime of the local Balancer-All-Tokenomics.csv that load_data() would read, or None if there is none."""
+    for data_dir in _get_possible_data_dirs():
+        path = os.path.join(os.path.abspath(data_dir), MAIN_DATA_FILENAME)
+        if os.path.exists(path) and os.path.getsize(path) > 100:
+            return os.path.getmtime(path)
+    return None
+
+
 def load_data():
+    """Cached main data; the local CSV mtime is part of the cache key, so replacing the file invalidates it."""
+    return _load_data(_local_main_data_mtime())
+
+
+def data_fingerprint(df):
+    """Key for session_state memos: row count, block_date span and the load that produced df (content hash if untagged)."""
+    dates = (df['block_date'].min(), df['block_date'].max()) if 'block_date' in df.columns else None
+    token = df.attrs.get('load_token')
+    if token is None:
+        token = int(pd.util.hash_pandas_object(df, index=False).sum())
+    return (len(df), dates, token)
+
+
+@st.cache_data(ttl=3600, show_spinner="Loading pool data…")
+def _load_data(source_mtime):
+    """Cached read of the main data, tagged with a load token so a refresh invalidates page-level memos."""
+    df = _read_main_data()
+    df.attrs['load_token'] = time.time_ns()
+    return df
+
+
+def _read_main_data():
     """Load main data: Balancer-All-Tokenomics. Prefer NEON (DATABASE_URL) if set; then local CSV; else Supabase; fallback: balancer_v2_merged / master."""
     database_url_set = bool(os.getenv("DATABASE_URL", "").strip())
     _log(f"[Data load] USE_NEON_VIEWS={USE_NEON_VIEWS!r}, DATABASE_URL set={database_url_set}")
@@ -2190,7 +2376,7 @@ def load_data():
         for data_dir in possible_data_dirs:
             path = os.path.join(os.path.abspath(data_dir), MAIN_DATA_FILENAME)
             if os.path.exists(path) and os.path.getsize(path) > 100:
-                df = pd.read_csv(path)
+                df = pd.read_csv(path, usecols=lambda c: c not in MAIN_DATA_UNUSED_COLUMNS)
                 if df is not None and not df.empty:
                     n = len(df)
                     _log(f"[Data load] Loaded from Local CSV, rows={n}")
@@ -2726,12 +2912,22 @@ def load_bribes_data():
         st.error(f"Error loading bribes data: {str(e)}")
         return pd.DataFrame()
 
+def _pool_ranking_key(df):
+    """Cheap cache key for the pool rankings: shape, distinct pools and total DAO profit (no full-frame hash)."""
+    return (
+        df.shape,
+        df['pool_symbol'].nunique() if 'pool_symbol' in df.columns else 0,
+        float(df['dao_profit_usd'].sum()) if 'dao_profit_usd' in df.columns else 0.0,
+    )
+
+@st.cache_data(max_entries=8, hash_funcs={pd.DataFrame: _pool_ranking_key})
 def get_top_pools(df, n=20):
     """Top N pools by sum(dao_profit_usd) per pool. dao_profit_usd = protocol_fee - direct_incentives."""
     if 'dao_profit_usd' not in df.columns or 'pool_symbol' not in df.columns:
         return []
     return df.groupby('pool_symbol')['dao_profit_usd'].sum().nlargest(n).index.tolist()
 
+@st.cache_data(max_entries=8, hash_funcs={pd.DataFrame: _pool_ranking_key})
 def get_worst_pools(df, n=20):
     """Worst N pools by sum(dao_profit_usd) per pool (most negative first)."""
     if 'dao_profit_usd' not in df.columns or 'pool_symbol' not in df.columns:
@@ -2883,6 +3079,43 @@ def run_simulation_sidebar(df):
     
     return df_sim
 
+DARK_LAYOUT = dict(
+    template='plotly_dark',
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    margin=dict(l=40, r=20, t=20, b=40),
+    xaxis=dict(
+        showgrid=False,
+        showline=True,
+        linecolor='rgba(255,255,255,0.1)',
+        title="",
+        tickfont=dict(size=11, color='#8B95A6')
+    ),
+    yaxis=dict(
+        showgrid=True,
+        gridcolor='rgba(255,255,255,0.05)',
+        showline=False,
+        tickfont=dict(size=11, color='#8B95A6')
+    ),
+    legend=dict(
+        orientation="h",
+        yanchor="top",
+        y=1.05,
+        xanchor="left",
+        x=0,
+        font=dict(size=11, color='#8B95A6')
+    )
+)
+
+def row_percentages(pivot):
+    """Each row of a pivot as % of its row total (rows summing to 0 stay 0), in a single NumPy pass."""
+    vals = pivot.to_numpy(dtype=float)
+    sums = vals.sum(axis=1, keepdims=True)
+    pct = np.zeros_like(vals)
+    np.divide(vals, sums, out=pct, where=sums > 0)
+    pct *= 100
+    return pd.DataFrame(pct, index=pivot.index, columns=pivot.columns)
+
 def create_minimalist_chart(x, y, name, color, height=400):
     fig = go.Figure()
     fig.add_trace(go.Scatter(
@@ -2920,11 +3153,29 @@ def create_minimalist_chart(x, y, name, color, height=400):
     
     return fig
 
+KNOWN_CATS = ['Legitimate', 'Sustainable', 'Mercenary', 'Undefined']
+_KNOWN_CATS_SET = frozenset(KNOWN_CATS)
+POOL_CATEGORY_DTYPE = pd.CategoricalDtype(categories=KNOWN_CATS, ordered=True)
+
+
+def normalize_pool_category(series):
+    """Normalize pool_category to the ordered KNOWN_CATS categorical (NaN, '', 'nan' and unknown labels -> 'Undefined').
+
+    Labels are stripped and matched once per distinct value; rows are remapped through their factorized codes.
+    """
+    if series.dtype == POOL_CATEGORY_DTYPE and not series.hasnans:
+        return series
+    codes, uniques = pd.factorize(series)
+    labels = pd.Index(uniques).astype(str).str.strip()
+    undefined_code = KNOWN_CATS.index('Undefined')
+    lookup = np.array([KNOWN_CATS.index(label) if label in _KNOWN_CATS_SET else undefined_code for label in labels] + [undefined_code], dtype=np.int8)
+    return pd.Series(pd.Categorical.from_codes(lookup[codes], dtype=POOL_CATEGORY_DTYPE), index=series.index, name=series.name)
+
+
 def _normalize_is_core_pool(series):
-    """Convert core_non_core or is_core_pool to 0/1 (handles bool, str 'True'/'False', numeric)."""
+    """Convert core_non_core or is_core_pool to 0/1 (handles bool, str 'True'/'False', numeric); each distinct value is converted once."""
     if series is None or len(series) == 0:
         return pd.Series(dtype=int)
-    s = series.astype(object)
     def to_int(x):
         try:
             if pd.isna(x):
@@ -2938,7 +3189,9 @@ def _normalize_is_core_pool(series):
             return 0
         except Exception:
             return 0
-    return s.map(to_int).astype(int)
+    codes, uniques = pd.factorize(series.astype(object))
+    lookup = np.array([to_int(x) for x in uniques] + [0], dtype=int)
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
 
 
 def calculate_emission_reduction_impact(df, reduction_factor, core_only=False, revenue_sensitivity=0.0):